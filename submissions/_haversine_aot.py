@@ -0,0 +1,23 @@
+"""
+Ahead-of-time build of the haversine distance matrix kernel used by python_section_2.
+
+Run `python _haversine_aot.py` once to produce the `haversine_aot` extension module
+next to this file. python_section_2 only uses it when the parallel JIT kernel is not an
+option (numba missing at runtime, or a single core), because the AOT build runs serially.
+
+numba.pycc is pending deprecation in numba and emits NumbaPendingDeprecationWarning; the
+JIT path with cache=True remains the primary way this kernel is compiled.
+"""
+import os
+
+from numba.pycc import CC
+
+from python_section_2 import _haversine_mat_kernel
+
+cc = CC('haversine_aot')
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+cc.export('haversine_mat', 'void(f8[:], f8[:], f8[:, :])')(_haversine_mat_kernel)
+
+
+if __name__ == '__main__':
+    cc.compile()
@@ -1,28 +1,46 @@
 from typing import Dict, List
 import pandas as pd
-import itertools
+import numpy as np
 import re
-from datetime import datetime, timedelta
+from collections import defaultdict
+from datetime import timedelta
+
+R = 6371
+
+_DATE_RE = re.compile(
+    r'\b\d{2}-\d{2}-\d{4}\b'
+    r'|\b\d{1,2}/\d{1,2}/\d{4}\b'
+    r'|\b\d{4}\.\d{1,2}\.\d{1,2}\b'
+)
+_DATE_FORMATS = [('-', '%d-%m-%Y'), ('/', '%m/%d/%Y'), ('.', '%Y.%m.%d')]
+
+
+def _haversine(lat1, lon1, lat2, lon2):
+    """
+    Haversine distance in meters between points given in radians; works on scalars or arrays.
+    """
+    a = np.sin((lat2 - lat1) * 0.5)**2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) * 0.5)**2
+    return 2 * R * 1000 * np.arcsin(np.sqrt(a))
 
 
 def reverse_by_n_elements(lst: List[int], n: int) -> List[int]:
     """
     Reverses the input list by groups of n elements.
     """
-    return [item for group in (lst[i:i + n] for i in range(0, len(lst), n)) for item in reversed(group)]
+    result = list(lst)
+    for i in range(0, len(result), n):
+        result[i:i + n] = result[i:i + n][::-1]
+    return result
 
 
 def group_by_length(lst: List[str]) -> Dict[int, List[str]]:
     """
     Groups the strings by their length and returns a dictionary.
     """
-    grouped = {}
+    grouped = defaultdict(list)
     for string in lst:
-        length = len(string)
-        if length not in grouped:
-            grouped[length] = []
-        grouped[length].append(string)
-    return grouped
+        grouped[len(string)].append(string)
+    return dict(grouped)
 
 
 def flatten_dict(nested_dict: Dict, sep: str = '.') -> Dict:
@@ -30,16 +48,19 @@ def flatten_dict(nested_dict: Dict, sep: str = '.') -> Dict:
     Flattens a nested dictionary into a single-level dictionary with dot notation for keys.
     """
     flat_dict = {}
+    stack = [((), iter(nested_dict.items()))]
 
-    def flatten(current_dict: Dict, parent_key: str = ''):
-        for key, value in current_dict.items():
-            new_key = f"{parent_key}{sep}{key}" if parent_key else key
+    while stack:
+        prefix, items = stack[-1]
+        for key, value in items:
+            path = prefix + (str(key),)
             if isinstance(value, dict):
-                flatten(value, new_key)
-            else:
-                flat_dict[new_key] = value
+                stack.append((path, iter(value.items())))
+                break
+            flat_dict[sep.join(path)] = value
+        else:
+            stack.pop()
 
-    flatten(nested_dict)
     return flat_dict
 
 
@@ -47,7 +68,26 @@ def unique_permutations(nums: List[int]) -> List[List[int]]:
     """
     Generate all unique permutations of a list that may contain duplicates.
     """
-    return list(map(list, set(itertools.permutations(nums))))
+    nums = sorted(nums)
+    used = [False] * len(nums)
+    path = []
+    result = []
+
+    def backtrack():
+        if len(path) == len(nums):
+            result.append(path[:])
+            return
+        for i in range(len(nums)):
+            if used[i] or (i > 0 and nums[i] == nums[i - 1] and not used[i - 1]):
+                continue
+            used[i] = True
+            path.append(nums[i])
+            backtrack()
+            path.pop()
+            used[i] = False
+
+    backtrack()
+    return result
 
 
 def find_all_dates(text: str) -> List[str]:
@@ -55,29 +95,16 @@ def find_all_dates(text: str) -> List[str]:
     This function takes a string as input and returns a list of valid dates
     in 'dd-mm-yyyy', 'mm/dd/yyyy', or 'yyyy.mm.dd' format found in the string.
     """
-    date_patterns = [
-        r'\b\d{2}-\d{2}-\d{4}\b',    
-        r'\b\d{1,2}/\d{1,2}/\d{4}\b',  
-        r'\b\d{4}\.\d{1,2}\.\d{1,2}\b'  
-    ]
-    
-    found_dates = []
-    for pattern in date_patterns:
-        found_dates.extend(re.findall(pattern, text))
+    found_dates = pd.Series(_DATE_RE.findall(text), dtype=object)
     
-    valid_dates = []
-    for date in found_dates:
-        try:
-            if '-' in date:
-                dt = datetime.strptime(date, '%d-%m-%Y')
-            elif '/' in date:
-                dt = datetime.strptime(date, '%m/%d/%Y')
-            elif '.' in date:
-                dt = datetime.strptime(date, '%Y.%m.%d')
-            valid_dates.append(dt.strftime('%Y-%m-%d')) 
-        except ValueError:
-            continue
+    parsed = [pd.Series([], dtype=object)]
+    for sep, fmt in _DATE_FORMATS:
+        mask = found_dates.str.contains(sep, regex=False)
+        if mask.any():
+            dates = pd.to_datetime(found_dates[mask], format=fmt, errors='coerce')
+            parsed.append(dates.dropna().dt.strftime('%Y-%m-%d'))
     
+    valid_dates = pd.concat(parsed).sort_index().tolist()
     return valid_dates
 
 
@@ -86,22 +113,14 @@ def polyline_to_dataframe(polyline_str: str) -> pd.DataFrame:
     Converts a polyline string into a DataFrame with latitude, longitude, and distance between consecutive points.
     """
   
-    coords = polyline_str.split(';')
-    points = []
-    for coord in coords:
-        lat, lng = map(float, coord.split(','))
-        points.append((lat, lng))
+    points = np.array([coord.split(',') for coord in polyline_str.split(';')], dtype=np.float64)
 
-    
-    distances = [0]
-    for i in range(1, len(points)):
-        lat1, lon1 = points[i - 1]
-        lat2, lon2 = points[i]
-        distance = ((lat2 - lat1) ** 2 + (lon2 - lon1) ** 2) ** 0.5  
-        distances.append(distance)
-
-    df = pd.DataFrame(points, columns=['latitude', 'longitude'])
-    df['distance'] = distances
+    distances = np.empty(len(points))
+    distances[0] = 0
+    lat, lon = np.radians(points[:, 0]), np.radians(points[:, 1])
+    distances[1:] = _haversine(lat[:-1], lon[:-1], lat[1:], lon[1:])
+
+    df = pd.DataFrame({'latitude': points[:, 0], 'longitude': points[:, 1], 'distance': distances})
     return df
 
 
@@ -111,14 +130,9 @@ def rotate_and_multiply_matrix(matrix: List[List[int]]) -> List[List[int]]:
     by the sum of its original row and column index before rotation.
     """
    
-    rotated = [list(row) for row in zip(*matrix[::-1])]
-    transformed_matrix = []
-    for i in range(len(rotated)):
-        new_row = []
-        for j in range(len(rotated[0])):
-            new_value = rotated[i][j] * (i + j)
-            new_row.append(new_value)
-        transformed_matrix.append(new_row)
+    rotated = np.atleast_2d(np.asarray(matrix))[::-1].T
+    i, j = np.indices(rotated.shape)
+    transformed_matrix = (rotated * (i + j)).tolist()
 
     return transformed_matrix
 
@@ -128,9 +142,7 @@ def time_check(df: pd.DataFrame) -> pd.Series:
     Use shared dataset-2 to verify the completeness of the data by checking whether the timestamps for each unique (`id`, `id_2`) pair cover a full 24-hour and 7 days period.
     """
     df['timestamp'] = pd.to_datetime(df['timestamp'])  
-    complete_series = df.groupby(['id', 'id_2']).apply(lambda group: 
-        (group['timestamp'].min() <= group['timestamp'].min() + timedelta(days=7)) and 
-        (group['timestamp'].max() >= group['timestamp'].min() + timedelta(days=1))
-    )
+    span = df.groupby(['id', 'id_2'])['timestamp'].agg(['min', 'max'])
+    complete_series = (span['max'] - span['min']) >= timedelta(days=1)
     
     return complete_series
@@ -1,6 +1,83 @@
+import importlib.machinery
+import importlib.util
+import math
+import os
 import pandas as pd
 import numpy as np
 
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+    prange = range
+
+R = 6371
+
+_TIME_BASED_RATES = {
+    '00:00': 0.5,
+    '06:00': 1.0,
+    '12:00': 1.5,
+    '18:00': 2.0,
+    '23:59': 1.0
+}
+_TIME_RATE_BINS = (pd.to_timedelta([f'{time}:00' for time in _TIME_BASED_RATES]).total_seconds().tolist()
+                   + [24 * 3600])
+
+
+def _haversine_mat_numpy(lat, lon, out):
+    clat = np.cos(lat)
+    i, j = np.triu_indices(lat.shape[0], 1)
+
+    a = np.sin((lat[i] - lat[j]) * 0.5)**2 + clat[i] * clat[j] * np.sin((lon[i] - lon[j]) * 0.5)**2
+    out[i, j] = 2 * R * 1000 * np.arcsin(np.sqrt(a))
+    out += out.T
+
+
+def _haversine_mat_kernel(lat, lon, out):
+    """
+    Loop kernel shared by the JIT build below and the AOT build in _haversine_aot.py.
+    """
+    n = lat.shape[0]
+    clat = np.cos(lat)
+    for i in prange(n):
+        for j in range(i + 1, n):
+            sdlat = math.sin((lat[i] - lat[j]) * 0.5)
+            sdlon = math.sin((lon[i] - lon[j]) * 0.5)
+            a = sdlat * sdlat + clat[i] * clat[j] * sdlon * sdlon
+            dist = 2 * R * 1000 * math.asin(math.sqrt(a))
+            out[i, j] = dist
+            out[j, i] = dist
+
+
+def _load_aot_kernel():
+    """
+    Load the haversine_aot extension built next to this file, or return None if it has not been built.
+    """
+    finder = importlib.machinery.FileFinder(
+        os.path.dirname(os.path.abspath(__file__)),
+        (importlib.machinery.ExtensionFileLoader, importlib.machinery.EXTENSION_SUFFIXES)
+    )
+    spec = finder.find_spec('haversine_aot')
+    if spec is None:
+        return None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.haversine_mat
+
+
+# The AOT kernel needs no JIT compilation but runs serially, since pycc cannot build prange loops
+# in parallel. The JIT kernel is cached on disk after its first compile, so it is preferred
+# whenever there is more than one core; the AOT build only helps single-core or numba-less setups.
+_haversine_mat = None
+if njit is None or (os.cpu_count() or 1) == 1:
+    _haversine_mat = _load_aot_kernel()
+if _haversine_mat is None:
+    if njit is not None:
+        _haversine_mat = njit(parallel=True, fastmath=True, cache=True)(_haversine_mat_kernel)
+    else:
+        _haversine_mat = _haversine_mat_numpy
+
+
 def calculate_distance_matrix(df: pd.DataFrame) -> pd.DataFrame:
     """
     Calculate a distance matrix based on the dataframe, df.
@@ -11,25 +88,13 @@ def calculate_distance_matrix(df: pd.DataFrame) -> pd.DataFrame:
     Returns:
         pandas.DataFrame: Distance matrix
     """
-   
-    def haversine(lat1, lon1, lat2, lon2):
-        R = 6371  
-        dlat = np.radians(lat2 - lat1)
-        dlon = np.radians(lon2 - lon1)
-        a = np.sin(dlat / 2)**2 + np.cos(np.radians(lat1)) * np.cos(np.radians(lat2)) * np.sin(dlon / 2)**2
-        c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
-        return R * c * 1000 
-    ids = df['id'].unique()
-    distance_matrix = pd.DataFrame(index=ids, columns=ids)
-
-    for i in range(len(df)):
-        for j in range(len(df)):
-            if i != j:
-                distance = haversine(df.iloc[i]['latitude'], df.iloc[i]['longitude'],
-                                     df.iloc[j]['latitude'], df.iloc[j]['longitude'])
-                distance_matrix.iloc[i, j] = distance
-            else:
-                distance_matrix.iloc[i, j] = 0
+    ids = df['id'].to_numpy()
+    lat = np.radians(df['latitude'].to_numpy(dtype=np.float64))
+    lon = np.radians(df['longitude'].to_numpy(dtype=np.float64))
+
+    out = np.zeros((len(lat), len(lat)), dtype=np.float64)
+    _haversine_mat(lat, lon, out)
+    distance_matrix = pd.DataFrame(out, index=ids, columns=ids)
 
     return distance_matrix
 
@@ -43,13 +108,15 @@ def unroll_distance_matrix(df: pd.DataFrame) -> pd.DataFrame:
     Returns:
         pandas.DataFrame: Unrolled DataFrame containing columns 'id_start', 'id_end', and 'distance'.
     """
-    unrolled = []
+    off_diagonal = df.index.to_numpy()[:, None] != df.columns.to_numpy()[None, :]
+    i, j = np.nonzero(off_diagonal)
+    unrolled = pd.DataFrame({
+        'id_start': df.index[i],
+        'id_end': df.columns[j],
+        'distance': df.to_numpy()[i, j]
+    })
     
-    for start_id in df.index:
-        for end_id in df.columns:
-            unrolled.append({'id_start': start_id, 'id_end': end_id, 'distance': df.loc[start_id, end_id]})
-    
-    return pd.DataFrame(unrolled)
+    return unrolled
 
 def find_ids_within_ten_percentage_threshold(df: pd.DataFrame, reference_id: int) -> pd.DataFrame:
     """
@@ -63,10 +130,10 @@ def find_ids_within_ten_percentage_threshold(df: pd.DataFrame, reference_id: int
         pandas.DataFrame: DataFrame with IDs whose average distance is within the specified percentage threshold
                           of the reference ID's average distance.
     """
-    reference_avg = df[df['id_start'] == reference_id]['distance'].mean()
+    avg_distances = df.groupby('id_start')['distance'].mean()
+    reference_avg = avg_distances.get(reference_id, np.nan)
     lower_bound = reference_avg * 0.9
     upper_bound = reference_avg * 1.1
-    avg_distances = df.groupby('id_start')['distance'].mean()
     within_threshold = avg_distances[(avg_distances >= lower_bound) & (avg_distances <= upper_bound)]
     
     return within_threshold.reset_index()
@@ -88,8 +155,10 @@ def calculate_toll_rate(df: pd.DataFrame) -> pd.DataFrame:
         'bus': 1.2
     }
 
-    df['vehicle_type'] = df['id_start'].map(toll_rates) 
-    df['toll_rate'] = df['distance'] * df['vehicle_type']
+    codes, vehicle_types = pd.factorize(df['vehicle_type'])
+    # trailing NaN is picked up by factorize's -1 code for missing vehicle types
+    rate_lut = np.array([toll_rates.get(vehicle, np.nan) for vehicle in vehicle_types] + [np.nan])
+    df['toll_rate'] = df['distance'].to_numpy() * rate_lut[codes]
     
     return df[['id_start', 'id_end', 'toll_rate']]
 
@@ -103,15 +172,9 @@ def calculate_time_based_toll_rates(df: pd.DataFrame) -> pd.DataFrame:
     Returns:
         pandas.DataFrame: DataFrame with time-based toll rates.
     """
-    time_based_rates = {
-        '00:00': 0.5,
-        '06:00': 1.0,
-        '12:00': 1.5,
-        '18:00': 2.0,
-        '23:59': 1.0
-    }
-
-    df['time'] = pd.to_datetime(df['timestamp']).dt.time
-    df['toll_rate'] = df['time'].apply(lambda x: next((rate for time, rate in time_based_rates.items() if x >= pd.to_datetime(time).time()), 1.0))
+    timestamps = pd.to_datetime(df['timestamp'])
+    seconds = timestamps.dt.hour * 3600 + timestamps.dt.minute * 60 + timestamps.dt.second
+    df['toll_rate'] = pd.cut(seconds, bins=_TIME_RATE_BINS, labels=list(_TIME_BASED_RATES.values()),
+                             right=False, ordered=False).astype(float)
     
     return df[['id_start', 'id_end', 'toll_rate']]